@@ -1,26 +1,36 @@
 ---------------------------------------------------------------
 --  export‑selected.remodel.lua
---  Dumps scripts from the most‑used developer services only.
+--  Places (.rbxl / .rbxlx): dumps scripts from the most‑used
+--  developer services only.
+--  Models (.rbxm / .rbxmx): dumps scripts under every root instance.
 ---------------------------------------------------------------
 
-local INPUT_FILE  = "game2.rbxl"   -- change if needed
-local OUTPUT_ROOT = "exported2"
+--  usage: remodel run extracter2.lua [input] [output]
+local INPUT_FILE, OUTPUT_ROOT = ...
+INPUT_FILE  = INPUT_FILE  or "game2.rbxl"   -- change if needed
+OUTPUT_ROOT = OUTPUT_ROOT or "exported2"
 
 ----------------------------------------------------------------
 --   helpers (same sanitise & path‑safety as before)
 ----------------------------------------------------------------
 local ILLEGAL      = '[<>:"/\\|%?%*%z\1-\31]'
-local RESERVED_WIN = { "CON","PRN","AUX","NUL",
-                       "COM1","COM2","COM3","COM4","COM5","COM6","COM7","COM8","COM9",
-                       "LPT1","LPT2","LPT3","LPT4","LPT5","LPT6","LPT7","LPT8","LPT9" }
+local RESERVED_WIN = {}
+for _, r in ipairs({ "CON","PRN","AUX","NUL",
+                     "COM1","COM2","COM3","COM4","COM5","COM6","COM7","COM8","COM9",
+                     "LPT1","LPT2","LPT3","LPT4","LPT5","LPT6","LPT7","LPT8","LPT9" }) do
+    RESERVED_WIN[r] = true
+end
+
+local sanitised = {}   -- raw name -> cleaned name (names repeat a lot)
 
-local function sanitise(name)
-    name = name:gsub(ILLEGAL, "_"):gsub("[%.%s]+$", "")
+local function sanitise(raw)
+    local name = sanitised[raw]
+    if name then return name end
+    name = raw:gsub(ILLEGAL, "_"):gsub("[%.%s]+$", "")
     if #name == 0 then name = "_" end
     if #name > 100 then name = name:sub(1,100) .. "…" end
-    for _, r in ipairs(RESERVED_WIN) do
-        if name:upper() == r then name = "_" .. name end
-    end
+    if RESERVED_WIN[name:upper()] then name = "_" .. name end
+    sanitised[raw] = name
     return name
 end
 
@@ -34,14 +44,49 @@ local function safeJoin(base, name)
     return p
 end
 
+local createdDirs = {}   -- dir -> true once it exists, false if creating it failed
+
+-- createDirAll also makes every ancestor, so record those as existing too
+local function markCreated(dir)
+    while dir and createdDirs[dir] ~= true do
+        createdDirs[dir] = true
+        dir = dir:match("^(.*)/")
+    end
+end
+
+-- Creates every directory in the `wanted` set once.  Deepest paths go
+-- first, so an ancestor is usually already marked by one of its
+-- descendants and costs no call of its own.
+local function createDirs(wanted)
+    local dirs = {}
+    for dir in pairs(wanted) do
+        if createdDirs[dir] == nil then dirs[#dirs + 1] = dir end
+    end
+    table.sort(dirs, function(a, b) return #a > #b end)
+
+    for _, dir in ipairs(dirs) do
+        if createdDirs[dir] == nil then
+            local ok, err = pcall(remodel.createDirAll, dir)
+            if ok then
+                markCreated(dir)
+            else
+                print("ERROR: Could not create directory " .. dir .. " - " .. tostring(err))
+                createdDirs[dir] = false
+            end
+        end
+    end
+end
+
 local function writeScript(inst, filePath)
     local ok, src = pcall(remodel.getRawProperty, inst, "Source")
     if ok and src then
-        local writeOk, writeErr = pcall(remodel.writeFile, filePath .. ".lua", src)
+        local outPath = filePath .. ".lua"
+        local writeOk, writeErr = pcall(remodel.writeFile, outPath, src)
         if writeOk then
-            print("Success:  " .. filePath .. ".lua")
+            print("Success:  " .. outPath)
+            return true
         else
-            print("ERROR writing file: " .. filePath .. ".lua - " .. tostring(writeErr))
+            print("ERROR writing file: " .. outPath .. " - " .. tostring(writeErr))
         end
     else
         print("WARNING: Could not read source from " .. (inst.Name or inst.ClassName) .. " - " .. tostring(src))
@@ -49,33 +94,22 @@ local function writeScript(inst, filePath)
 end
 
 local exportCount = 0
-local function export(inst, basePath, depth)
-    depth = depth or 0
+
+-- Handles one instance, queues its children on `stack` and scripts on `plan`
+local function visit(inst, basePath, depth, stack, plan)
     local indent = string.rep("  ", depth)
-    
-    -- Safety check for infinite recursion
-    if depth > 50 then
-        print("WARNING: Maximum depth reached at " .. (inst.Name or inst.ClassName))
-        return
-    end
-    
+
     local instName = inst.Name or inst.ClassName or "_"
     print(indent .. "Processing: " .. instName .. " (" .. inst.ClassName .. ")")
     
     local this = sanitise(instName)
     local here = safeJoin(basePath, this)
 
-    -- Better error handling for directory creation
-    local dirOk, dirErr = pcall(remodel.createDirAll, here)
-    if not dirOk then
-        print("ERROR: Could not create directory " .. here .. " - " .. tostring(dirErr))
-        return
-    end
-
     local cls = inst.ClassName
     if cls == "Script" or cls == "LocalScript" or cls == "ModuleScript" then
-        exportCount = exportCount + 1
-        writeScript(inst, here)
+        -- safeJoin may have shortened basePath, so plan the directory
+        -- that really holds the file rather than basePath itself
+        plan[#plan + 1] = { inst, here:match("^(.*)/"), here }
     end
 
     -- Better error handling for getting children
@@ -85,52 +119,102 @@ local function export(inst, basePath, depth)
         return
     end
     
-    for i, child in ipairs(children) do
+    -- Pushed in reverse so they pop in their original order; every
+    -- 10th child of a large parent carries its progress counter
+    local n = #children
+    for i = n, 1, -1 do
+        local progress = n > 10 and i % 10 == 0 and i or nil
+        stack[#stack + 1] = { children[i], here, depth + 1, progress, n }
+    end
+end
+
+-- Depth-first walk over an explicit stack, so deeply nested
+-- Folder trees neither hit a depth cap nor grow the C stack.
+-- Scripts are only planned during the walk; directories are then
+-- created in one batch and the files written back to back.
+local function export(root, rootPath)
+    local stack = { { root, rootPath, 0 } }
+    local plan  = {}
+    while #stack > 0 do
+        local entry = table.remove(stack)
+        local inst, basePath, depth, progress = entry[1], entry[2], entry[3], entry[4]
+
         -- Add progress indicator for large numbers of children
-        if #children > 10 and i % 10 == 0 then
-            print(indent .. "  Progress: " .. i .. "/" .. #children .. " children processed")
+        if progress then
+            print(string.rep("  ", depth - 1) .. "  Progress: " .. progress .. "/" .. entry[5] .. " children processed")
         end
-        
+
         -- Wrap each child export in error handling
-        local exportOk, exportErr = pcall(export, child, here, depth + 1)
-        if not exportOk then
-            print("ERROR: Failed to export child " .. (child.Name or child.ClassName) .. " - " .. tostring(exportErr))
+        local visitOk, visitErr = pcall(visit, inst, basePath, depth, stack, plan)
+        if not visitOk then
+            if depth == 0 then error(visitErr, 0) end
+            print("ERROR: Failed to export child " .. (inst.Name or inst.ClassName) .. " - " .. tostring(visitErr))
+        end
+    end
+
+    local dirs = {}
+    for _, job in ipairs(plan) do dirs[job[2]] = true end
+    createDirs(dirs)
+
+    for _, job in ipairs(plan) do
+        if not createdDirs[job[2]] then
+            print("WARNING: Skipping " .. job[3] .. ".lua - directory " .. job[2] .. " could not be created")
+        elseif writeScript(job[1], job[3]) then
+            exportCount = exportCount + 1
         end
     end
 end
 
 ----------------------------------------------------------------
---  load place
+--  load place / model
+--  remodel decodes binary and XML formats natively; models
+--  (.rbxm / .rbxmx) must go through readModelFile instead.
 ----------------------------------------------------------------
-local okPlace, place = pcall(remodel.readPlaceFile, INPUT_FILE)
-assert(okPlace and place, "Cannot open "..INPUT_FILE)
-
-print("> Exporting scripts from "..INPUT_FILE.." …")
-
--- List only the developer‑facing services we want
-local TARGET_SERVICES = {
-    { place.ServerScriptService,                         "ServerScriptService"      },
-    { place.ServerStorage,                               "ServerStorage"            },
-    { place.ReplicatedStorage,                           "ReplicatedStorage"        },
-    { place.StarterPlayer and
-      place.StarterPlayer.StarterPlayerScripts,          "StarterPlayerScripts"     },
-    { place.StarterGui,                                  "StarterGui"               },
-    { place.StarterPack,                                 "StarterPack"              },
-    { place.Workspace,                                   "Workspace"                },
-}
-
-for _, pair in ipairs(TARGET_SERVICES) do
-    local svc, label = pair[1], pair[2]
-    if svc then
-        print("\n=== Exporting " .. label .. " ===")
-        local serviceOk, serviceErr = pcall(export, svc, OUTPUT_ROOT .. "/" .. label)
-        if not serviceOk then
-            print("ERROR: Failed to export service " .. label .. " - " .. tostring(serviceErr))
+local ext = (INPUT_FILE:match("%.([^%.]+)$") or ""):lower()
+
+if ext == "rbxm" or ext == "rbxmx" then
+    local okModel, roots = pcall(remodel.readModelFile, INPUT_FILE)
+    assert(okModel and roots, "Cannot open "..INPUT_FILE)
+
+    print("> Exporting scripts from "..INPUT_FILE.." …")
+
+    for _, root in ipairs(roots) do
+        local rootOk, rootErr = pcall(export, root, OUTPUT_ROOT)
+        if not rootOk then
+            print("ERROR: Failed to export " .. (root.Name or root.ClassName) .. " - " .. tostring(rootErr))
+        end
+    end
+else
+    local okPlace, place = pcall(remodel.readPlaceFile, INPUT_FILE)
+    assert(okPlace and place, "Cannot open "..INPUT_FILE)
+
+    print("> Exporting scripts from "..INPUT_FILE.." …")
+
+    -- List only the developer‑facing services we want
+    local TARGET_SERVICES = {
+        { place.ServerScriptService,                         "ServerScriptService"      },
+        { place.ServerStorage,                               "ServerStorage"            },
+        { place.ReplicatedStorage,                           "ReplicatedStorage"        },
+        { place.StarterPlayer and
+          place.StarterPlayer.StarterPlayerScripts,          "StarterPlayerScripts"     },
+        { place.StarterGui,                                  "StarterGui"               },
+        { place.StarterPack,                                 "StarterPack"              },
+        { place.Workspace,                                   "Workspace"                },
+    }
+
+    for _, pair in ipairs(TARGET_SERVICES) do
+        local svc, label = pair[1], pair[2]
+        if svc then
+            print("\n=== Exporting " .. label .. " ===")
+            local serviceOk, serviceErr = pcall(export, svc, OUTPUT_ROOT .. "/" .. label)
+            if not serviceOk then
+                print("ERROR: Failed to export service " .. label .. " - " .. tostring(serviceErr))
+            else
+                print("=== Completed " .. label .. " ===")
+            end
         else
-            print("=== Completed " .. label .. " ===")
+            print("WARNING: Service " .. label .. " not found or is nil")
         end
-    else
-        print("WARNING: Service " .. label .. " not found or is nil")
     end
 end
 